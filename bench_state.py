@@ -0,0 +1,71 @@
+"""Report the resident bytes per hosted session for the old and new state shapes"""
+import argparse
+import sys
+import tracemalloc
+
+from state import CompanyBook, TermState
+
+TERMS = [("EBITDA", "$"), ("Interest Rate", "%"), ("Multiple", "x"), ("Factor Score", "x")]
+COMPANIES = [1, 2, 3]
+
+
+def fresh(text: str) -> str:
+    """A new str object, like the ones psycopg2 builds for every fetched row"""
+    return "".join(list(text))
+
+
+def legacy_session(i: int):
+    """Nested dicts as returned by the old get_term_data and calculate_results"""
+    terms = {
+        fresh(term): {'value': float(i + n), 'unit': fresh(unit), 'status': fresh("OK")}
+        for n, (term, unit) in enumerate(TERMS)
+    }
+    shares_bid = {c: i + c * 100 for c in COMPANIES}
+    results = {
+        "shares_bid": shares_bid,
+        "capital_raised": {c: shares_bid[c] * 1.5 if c != 3 else fresh("Allocate") for c in COMPANIES},
+        "subscription": {c: fresh("Under" if c != 3 else "Over") for c in COMPANIES},
+        "most_bids": max(shares_bid.items(), key=lambda x: x[1])[0]
+    }
+    return terms, results
+
+
+def compact_session(i: int):
+    """Slotted terms with interned statuses and a column-backed company book"""
+    terms = {
+        sys.intern(fresh(term)): TermState.from_row(float(i + n), fresh(unit), fresh("OK"))
+        for n, (term, unit) in enumerate(TERMS)
+    }
+    book = CompanyBook(COMPANIES)
+    for c in COMPANIES:
+        book.set_company(c, 1.5, 1000 if c != 3 else 0, i + c * 100)
+    return terms, book
+
+
+def measure(build, sessions: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    resident = [build(i) for i in range(sessions)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    # Leave out the list that holds the sessions
+    total -= resident.__sizeof__()
+    return total / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=20000)
+    args = parser.parse_args()
+
+    legacy = measure(legacy_session, args.sessions)
+    compact = measure(compact_session, args.sessions)
+    print(f"Sessions:        {args.sessions:,}")
+    print(f"Nested dicts:    {legacy:,.0f} bytes/session")
+    print(f"Compact state:   {compact:,.0f} bytes/session")
+    print(f"Saved:           {1 - compact / legacy:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import psycopg2
 from psycopg2 import sql
+from psycopg2.pool import ThreadedConnectionPool
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+import argparse
 import os
 from dotenv import load_dotenv
 
@@ -53,6 +55,43 @@ def get_connection():
         raise
 
 
+_pool = None
+
+
+def get_pool(minconn=None, maxconn=None):
+    """Get the shared connection pool, creating it on first use
+
+    The pool closes returned connections once minconn of them are idle, so
+    minconn defaults to the pool size to keep every connection open.
+    """
+    global _pool
+    if _pool is None:
+        maxconn = maxconn or int(os.getenv("DB_POOL_SIZE", 10))
+        minconn = minconn or int(os.getenv("DB_POOL_MIN", maxconn))
+        try:
+            _pool = ThreadedConnectionPool(
+                min(minconn, maxconn),
+                maxconn,
+                host=os.getenv("DB_HOST"),
+                database="simulation_games",
+                user=os.getenv("DB_USER"),
+                password=os.getenv("DB_PASSWORD"),
+                port=os.getenv("DB_PORT")
+            )
+        except Exception as e:
+            print(f"Error creating connection pool: {e}")
+            raise
+    return _pool
+
+
+def close_pool():
+    """Close every connection held by the shared pool"""
+    global _pool
+    if _pool is not None:
+        _pool.closeall()
+        _pool = None
+
+
 def init_db():
     """Initialize the database with required tables"""
     conn = None
@@ -85,6 +124,42 @@ def init_db():
                 initial_terms
             )
 
+        # Create game2 tables
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS game2_pricing (
+                company INTEGER,
+                price FLOAT,
+                shares INTEGER,
+                team_id INTEGER,
+                PRIMARY KEY (company, team_id)
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS game2_bids (
+                investor INTEGER,
+                company INTEGER,
+                shares_bid INTEGER,
+                team_id INTEGER,
+                PRIMARY KEY (investor, company, team_id)
+            )
+        """)
+
+        # Per-company bid totals, kept up to date by Game2.save_bid
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS game2_bid_totals (
+                company INTEGER,
+                team_id INTEGER,
+                shares_bid BIGINT NOT NULL DEFAULT 0,
+                bidder_count INTEGER NOT NULL DEFAULT 0,
+                max_bid INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (company, team_id)
+            )
+        """)
+        # Backfill only; drift is checked with `python database.py --verify`
+        cur.execute("SELECT COUNT(*) FROM game2_bid_totals")
+        if cur.fetchone()[0] == 0:
+            rebuild_bid_totals(cur)
+
         conn.commit()
         cur.close()
         print("Database initialized successfully")
@@ -98,6 +173,95 @@ def init_db():
             conn.close()
 
 
+BID_TOTALS_QUERY = """
+    SELECT company, team_id,
+           COALESCE(SUM(shares_bid), 0),
+           COUNT(*) FILTER (WHERE shares_bid > 0),
+           COALESCE(MAX(shares_bid), 0)
+    FROM game2_bids
+    GROUP BY company, team_id
+"""
+
+
+def rebuild_bid_totals(cur):
+    """Recompute game2_bid_totals from the raw bids"""
+    cur.execute("DELETE FROM game2_bid_totals")
+    cur.execute(f"""
+        INSERT INTO game2_bid_totals (company, team_id, shares_bid, bidder_count, max_bid)
+        {BID_TOTALS_QUERY}
+    """)
+
+
+def find_bid_total_mismatches(cur):
+    """Compare game2_bid_totals against the raw aggregate over game2_bids
+
+    Returns the (company, team_id) pairs whose totals differ, mapped to the
+    (shares_bid, bidder_count, max_bid) rows found in each.
+    """
+    cur.execute(BID_TOTALS_QUERY)
+    expected = {tuple(row[:2]): tuple(row[2:]) for row in cur.fetchall()}
+    cur.execute("""
+        SELECT company, team_id, shares_bid, bidder_count, max_bid
+        FROM game2_bid_totals
+    """)
+    actual = {tuple(row[:2]): tuple(row[2:]) for row in cur.fetchall()}
+
+    empty = (0, 0, 0)
+    mismatches = {}
+    for key in set(expected) | set(actual):
+        if expected.get(key, empty) != actual.get(key, empty):
+            mismatches[key] = {
+                "expected": expected.get(key, empty),
+                "actual": actual.get(key, empty)
+            }
+    return mismatches
+
+
+def check_bid_totals(cur) -> bool:
+    """Rebuild game2_bid_totals if it has drifted from the raw bids"""
+    # Hold off save_bid until the check (and any rebuild) is committed
+    cur.execute("LOCK TABLE game2_bid_totals IN EXCLUSIVE MODE")
+    mismatches = find_bid_total_mismatches(cur)
+    if not mismatches:
+        return True
+
+    for (company, team_id), totals in sorted(mismatches.items()):
+        print(f"Bid totals mismatch for company {company} (team {team_id}): "
+              f"expected {totals['expected']}, found {totals['actual']}")
+    rebuild_bid_totals(cur)
+    print("Bid totals rebuilt from game2_bids")
+    return False
+
+
+def verify_bid_totals() -> bool:
+    """Check game2_bid_totals against game2_bids, rebuilding it on mismatch"""
+    conn = None
+    try:
+        conn = get_connection()
+        with conn.cursor() as cur:
+            consistent = check_bid_totals(cur)
+        conn.commit()
+        if consistent:
+            print("Bid totals are consistent")
+        return consistent
+    except Exception as e:
+        print(f"Error verifying bid totals: {e}")
+        if conn:
+            conn.rollback()
+        raise
+    finally:
+        if conn:
+            conn.close()
+
+
 if __name__ == "__main__":
-    create_database()
-    init_db()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Set up the simulation games database")
+    parser.add_argument("--verify", action="store_true",
+                        help="only check game2_bid_totals against game2_bids (rebuilding it on mismatch)")
+    args = parser.parse_args()
+
+    if args.verify:
+        verify_bid_totals()
+    else:
+        create_database()
+        init_db()
\ No newline at end of file
@@ -1,11 +1,14 @@
 import os
 import signal
+import sys
 
 from rich.console import Console
 from rich.table import Table
 import questionary
 import database
 from redis_utils import redis_manager
+from leaderboard import leaderboard
+from state import TermState, TermStatus
 import threading
 import time
 from typing import Dict
@@ -14,11 +17,12 @@ console = Console()
 
 
 class Game1:
-    def __init__(self, team: str):
+    def __init__(self, team: str, conn=None):
         self.team = team
         self.terms = ["EBITDA", "Interest Rate", "Multiple", "Factor Score"]
-        self.conn = database.get_connection()
+        self.conn = conn or database.get_connection()
         self.redis = redis_manager
+        self.session = os.getenv("SESSION_ID", "default")
         self.should_exit = threading.Event()
         self.needs_refresh = threading.Event()
         self.display_lock = threading.Lock()
@@ -29,11 +33,15 @@ class Game1:
             cur.execute("SELECT COUNT(*) FROM game1_terms WHERE team2_status != 'OK'")
             return cur.fetchone()[0] == 0
 
-    def get_term_data(self) -> Dict:
+    def all_values_entered(self, term_data: Dict[str, TermState]) -> bool:
+        """Check if Team 1 has entered a value for every term"""
+        return all(data.value is not None for data in term_data.values())
+
+    def get_term_data(self) -> Dict[str, TermState]:
         """Fetch current term data from database"""
         with self.conn.cursor() as cur:
             cur.execute("SELECT term, team1_value, unit, team2_status FROM game1_terms")
-            return {row[0]: {'value': row[1], 'unit': row[2], 'status': row[3]} for row in cur.fetchall()}
+            return {sys.intern(row[0]): TermState.from_row(*row[1:]) for row in cur.fetchall()}
 
     def run(self):
         if self.team == "Team 1":
@@ -76,7 +84,6 @@ class Game1:
                     elif action == "edit":
                         term = questionary.select("Select term to edit:", choices=self.terms).ask()
                         self.update_term(term)
-                        self.redis.publish_update("team1_updates", term)
                         console.print(f"\n[bold yellow]Updated {term} - Team 2 notified[/bold yellow]")
                         time.sleep(1)
                         self.display_outputs()
@@ -125,15 +132,7 @@ class Game1:
                             ]
                         ).ask()
 
-                        with self.conn.cursor() as cur:
-                            cur.execute("""
-                                UPDATE game1_terms
-                                SET team2_status = %s
-                                WHERE term = %s
-                            """, (status, term))
-                            self.conn.commit()
-
-                        self.redis.publish_update("team2_updates", term)
+                        self.set_term_status(term, status)
                         console.print(f"\n[bold green]{term} status updated to {status}[/bold green]")
                         time.sleep(1)
                         self.display_outputs()
@@ -184,14 +183,35 @@ class Game1:
             validate=lambda val: val.replace('.', '', 1).isdigit()
         ).ask()
 
+        self.save_term(term, float(value))
+
+    def save_term(self, term: str, value: float):
+        """Save Team 1's value for a term, reset it to TBD and notify Team 2"""
         with self.conn.cursor() as cur:
             cur.execute("""
                 UPDATE game1_terms
                 SET team1_value = %s, team2_status = 'TBD', last_updated = NOW()
                 WHERE term = %s
-            """, (float(value), term))
+            """, (value, term))
             self.conn.commit()
             self.redis.publish_update("team1_updates", term)
+        leaderboard.record_deal_started(self.session)
+
+    def set_term_status(self, term: str, status: str):
+        """Save Team 2's approval status for a term and notify Team 1"""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                UPDATE game1_terms
+                SET team2_status = %s
+                WHERE term = %s
+            """, (status, term))
+            self.conn.commit()
+        self.redis.publish_update("team2_updates", term)
+
+        if status == TermStatus.OK and self.all_terms_approved():
+            term_data = self.get_term_data()
+            if self.all_values_entered(term_data):
+                leaderboard.record_deal_closed(self.session, self.valuation_amount(term_data))
 
     def display_outputs(self):
         """Display current terms and statuses"""
@@ -205,11 +225,11 @@ class Game1:
         table.add_column("Status", justify="right")
 
         for term, data in term_data.items():
-            status = '[green]OK[/green]' if data['status'] == 'OK' else '[red]TBD[/red]'
+            status = '[green]OK[/green]' if data.status is TermStatus.OK else '[red]TBD[/red]'
             table.add_row(
                 term,
-                str(data['value']),
-                data['unit'],
+                str(data.value),
+                data.unit,
                 status
             )
 
@@ -234,8 +254,8 @@ class Game1:
         for term, data in term_data.items():
             table.add_row(
                 term,
-                str(data['value']),
-                data['unit'],
+                str(data.value),
+                data.unit,
                 "OK"
             )
 
@@ -248,12 +268,16 @@ class Game1:
         self.should_exit.set()
         # os.kill(os.getpid(), signal.SIGINT)  # Like Ctrl+C to exit program
 
-    def calculate_valuation(self, term_data: Dict) -> str:
-        """Calculate final valuation based on approved terms"""
-        ebitda = term_data['EBITDA']['value']
-        rate = term_data['Interest Rate']['value']
-        multiple = term_data['Multiple']['value']
-        factor = term_data['Factor Score']['value']
+    def valuation_amount(self, term_data: Dict[str, TermState]) -> float:
+        """Calculate the numeric valuation from the approved terms"""
+        ebitda = term_data['EBITDA'].value
+        rate = term_data['Interest Rate'].value
+        multiple = term_data['Multiple'].value
+        factor = term_data['Factor Score'].value
+
+        return ebitda * multiple * factor
 
-        valuation = ebitda * multiple * factor
+    def calculate_valuation(self, term_data: Dict[str, TermState]) -> str:
+        """Calculate final valuation based on approved terms"""
+        valuation = self.valuation_amount(term_data)
         return f"${valuation:,.2f}"
\ No newline at end of file
@@ -1,9 +1,12 @@
+import os
 import questionary
 from rich.console import Console
 from rich.table import Table
 from typing import Dict, List, Union
 import database
 from redis_utils import redis_manager
+from leaderboard import leaderboard
+from state import ALLOCATE, CompanyBook
 import threading
 import time
 import psycopg2
@@ -12,13 +15,14 @@ console = Console()
 
 
 class Game2:
-    def __init__(self, team: str):
+    def __init__(self, team: str, conn=None):
         self.team = team
         self.companies = [1, 2, 3]
         self.investors = [1, 2, 3]
-        self.conn = database.get_connection()
+        self.conn = conn or database.get_connection()
         self.console = Console()
         self.redis = redis_manager
+        self.session = os.getenv("SESSION_ID", "default")
         self.should_exit = threading.Event()
         self.needs_refresh = threading.Event()
         self.display_lock = threading.Lock()
@@ -31,6 +35,12 @@ class Game2:
             cur.execute("SELECT COUNT(*) FROM game2_pricing WHERE price > 0 AND shares > 0")
             return cur.fetchone()[0] == 3
 
+    def has_team2_bids_done(self) -> bool:
+        """Check if every investor has bid on every company"""
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM game2_bids WHERE team_id = 2")
+            return cur.fetchone()[0] == len(self.investors) * len(self.companies)
+
     def team2_bidding(self):
         self.console.print("\nTeam 1 ready - enter your bids:", style="bold green")
         self.input_bids()
@@ -163,90 +173,100 @@ class Game2:
             """, (company, price, shares, price, shares))
             self.conn.commit()
 
-    def save_bid(self, investor: int, company: int, shares_bid: int):
-        """Save Team 2's bid input to database"""
+    def save_bid(self, investor: int, company: int, shares_bid: int) -> int:
+        """Save Team 2's bid input to database and return the bid it replaced"""
         with self.conn.cursor() as cur:
+            # Lock the company's totals row so concurrent bids apply their deltas in turn
+            cur.execute("""
+                INSERT INTO game2_bid_totals (company, team_id)
+                VALUES (%s, 2)
+                ON CONFLICT (company, team_id) DO NOTHING
+            """, (company,))
+            cur.execute("""
+                SELECT max_bid FROM game2_bid_totals
+                WHERE company = %s AND team_id = 2
+                FOR UPDATE
+            """, (company,))
+            max_bid = cur.fetchone()[0]
+
+            # The CTE sees the row as it was before the upsert
             cur.execute("""
+                WITH old AS (
+                    SELECT shares_bid FROM game2_bids
+                    WHERE investor = %s AND company = %s AND team_id = 2
+                )
                 INSERT INTO game2_bids (investor, company, shares_bid, team_id)
                 VALUES (%s, %s, %s, 2)
                 ON CONFLICT (investor, company, team_id) 
-                DO UPDATE SET shares_bid = %s
-            """, (investor, company, shares_bid, shares_bid))
+                DO UPDATE SET shares_bid = EXCLUDED.shares_bid
+                RETURNING (SELECT shares_bid FROM old)
+            """, (investor, company, investor, company, shares_bid))
+            old_bid = cur.fetchone()[0] or 0
+
+            if shares_bid >= max_bid:
+                max_bid = shares_bid
+            elif old_bid == max_bid:
+                # The highest bid went down, so the new maximum has to be looked up
+                cur.execute("""
+                    SELECT MAX(shares_bid) FROM game2_bids
+                    WHERE company = %s AND team_id = 2
+                """, (company,))
+                max_bid = cur.fetchone()[0] or 0
+
+            cur.execute("""
+                UPDATE game2_bid_totals
+                SET shares_bid = shares_bid + %s,
+                    bidder_count = bidder_count + %s,
+                    max_bid = %s
+                WHERE company = %s AND team_id = 2
+            """, (shares_bid - old_bid, int(shares_bid > 0) - int(old_bid > 0), max_bid, company))
             self.conn.commit()
+        leaderboard.record_bid(self.session, company, shares_bid - old_bid)
+        return old_bid
 
     def calculate_results(self) -> Dict[str, Dict[int, Union[float, str]]]:
         """Calculate all game results"""
-        return {
-            "shares_bid": self.calculate_shares_bid(),
-            "capital_raised": self.calculate_capital_raised(),
-            "subscription": self.determine_subscription(),
-            "most_bids": self.find_most_bids_company()
-        }
-
-    def calculate_shares_bid(self) -> Dict[int, float]:
-        """Sum all bids for each company"""
-        shares_bid = {}
+        return self.load_book().as_dict()
+
+    def load_book(self) -> CompanyBook:
+        """Fetch price, available shares and shares bid for each company"""
+        book = CompanyBook(self.companies)
         with self.conn.cursor() as cur:
-            for company in self.companies:
-                cur.execute("""
-                    SELECT SUM(shares_bid) FROM game2_bids 
-                    WHERE company = %s AND team_id = 2
-                """, (company,))
-                shares_bid[company] = cur.fetchone()[0] or 0
-        return shares_bid
+            cur.execute("""
+                SELECT p.company, p.price, p.shares, COALESCE(t.shares_bid, 0)
+                FROM game2_pricing p
+                LEFT JOIN game2_bid_totals t
+                    ON t.company = p.company AND t.team_id = 2
+                WHERE p.team_id = 1
+            """)
+            priced = set()
+            for company, price, shares, shares_bid in cur.fetchall():
+                if company in book.companies:
+                    book.set_company(company, price, shares, shares_bid)
+                    priced.add(company)
+
+        unpriced = [company for company in self.companies if company not in priced]
+        if unpriced:
+            raise ValueError(f"No pricing entered for companies: {unpriced}")
+        return book
 
     def calculate_capital_raised(self) -> Dict[int, Union[float, str]]:
         """Calculate capital raised for each company"""
-        capital_raised = {}
-        shares_bid = self.calculate_shares_bid()
-
-        with self.conn.cursor() as cur:
-            for company in self.companies:
-                cur.execute("""
-                    SELECT price, shares FROM game2_pricing
-                    WHERE company = %s AND team_id = 1
-                """, (company,))
-                price, available_shares = cur.fetchone()
-
-                if shares_bid[company] <= available_shares:
-                    capital_raised[company] = shares_bid[company] * price
-                else:
-                    capital_raised[company] = "Allocate"
-
-        return capital_raised
+        return self.load_book().as_dict()["capital_raised"]
 
     def determine_subscription(self) -> Dict[int, str]:
         """Determine subscription status for each company"""
-        subscription = {}
-        shares_bid = self.calculate_shares_bid()
-
-        with self.conn.cursor() as cur:
-            for company in self.companies:
-                cur.execute("""
-                    SELECT shares FROM game2_pricing
-                    WHERE company = %s AND team_id = 1
-                """, (company,))
-                available_shares = cur.fetchone()[0]
-
-                if shares_bid[company] == available_shares:
-                    subscription[company] = "Filled"
-                elif shares_bid[company] < available_shares:
-                    subscription[company] = "Under"
-                else:
-                    subscription[company] = "Over"
-
-        return subscription
+        return self.load_book().as_dict()["subscription"]
 
     def find_most_bids_company(self) -> int:
         """Identify which company received the most bids"""
-        shares_bid = self.calculate_shares_bid()
-        return max(shares_bid.items(), key=lambda x: x[1])[0]
+        return self.load_book().most_bids()
 
     def display_results(self):
         """Display results in a formatted table"""
         with self.display_lock:
-            results = self.calculate_results()
-            most_bids = self.find_most_bids_company()
+            book = self.load_book()
+            most_bids = book.most_bids()
 
             self.console.clear()
             summary_table = Table(title="Common Outputs Shown to Both Teams", show_header=True)
@@ -256,19 +276,19 @@ class Game2:
 
             # Add shares bid row
             shares_row = ["Shares Bid For"]
-            shares_row.extend([str(results["shares_bid"][c]) for c in self.companies])
+            shares_row.extend([str(book.bids[book.index(c)]) for c in self.companies])
             summary_table.add_row(*shares_row)
 
             # Add capital raised row
             capital_row = ["Capital Raised"]
-            capital_row.extend([
-                str(results["capital_raised"][c]) for c in self.companies
-            ])
+            for c in self.companies:
+                capital = book.capital_raised(c)
+                capital_row.append(ALLOCATE if capital is None else str(capital))
             summary_table.add_row(*capital_row)
 
             # Add subscription row
             sub_row = ["Subscription"]
-            sub_row.extend(results["subscription"][c] for c in self.companies)
+            sub_row.extend(book.subscription(c).value for c in self.companies)
             summary_table.add_row(*sub_row)
 
             self.console.print(summary_table)
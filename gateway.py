@@ -0,0 +1,300 @@
+import asyncio
+import json
+import logging
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web, WSMsgType
+import psycopg2
+import redis.asyncio as aioredis
+from dotenv import load_dotenv
+
+import database
+from game1 import Game1
+from game2 import Game2
+
+load_dotenv()
+
+GAME_CHANNELS = {
+    "game1": ("team1_updates", "team2_updates"),
+    "game2": ("team1_completed", "team2_completed"),
+}
+
+# Bad requests from a client, answered with a 400 / error reply
+CLIENT_ERRORS = (ValueError, KeyError)
+
+
+class GatewaySession:
+    """One Redis subscription per game, fanned out to every connected client"""
+
+    def __init__(self, gateway, game: str):
+        self.gateway = gateway
+        self.game = game
+        self.clients = set()
+        self.listener = None
+
+    async def add_client(self, ws):
+        self.clients.add(ws)
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.create_task(self.listen_for_updates())
+
+    async def remove_client(self, ws):
+        self.clients.discard(ws)
+        if not self.clients and self.listener is not None:
+            self.listener.cancel()
+            self.listener = None
+
+    async def listen_for_updates(self):
+        """Re-read state once per update and push it to every client"""
+        pubsub = self.gateway.redis.pubsub()
+        await pubsub.subscribe(*GAME_CHANNELS[self.game])
+        try:
+            async for message in pubsub.listen():
+                if message['type'] != 'message':
+                    continue
+                try:
+                    state = await self.gateway.read_state(self.game)
+                    await self.broadcast({
+                        "type": "update",
+                        "game": self.game,
+                        "channel": message['channel'],
+                        "data": message['data'],
+                        "state": state
+                    })
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Skip this update; the next one carries the full state again
+                    logging.error(f"Gateway update error for {self.game}: {e}")
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logging.error(f"Gateway listener error for {self.game}: {e}")
+        finally:
+            await pubsub.reset()
+
+    async def broadcast(self, payload: dict):
+        text = json.dumps(payload)
+        for ws in list(self.clients):
+            try:
+                await ws.send_str(text)
+            except ConnectionResetError:
+                self.clients.discard(ws)
+
+
+class Gateway:
+    """Owns the pooled Postgres connections and the per-game Redis subscriptions"""
+
+    def __init__(self):
+        self.pool = database.get_pool()
+        # One worker per pooled connection, so getconn() never finds the pool empty
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.pool.maxconn,
+            thread_name_prefix="gateway-db"
+        )
+        self.redis = aioredis.Redis(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", 6379)),
+            password=os.getenv("REDIS_PASSWORD", None),
+            socket_connect_timeout=3,
+            decode_responses=True
+        )
+        self.sessions = {game: GatewaySession(self, game) for game in GAME_CHANNELS}
+        self.actions = {
+            "edit_term": ("game1", self.edit_term),
+            "set_status": ("game1", self.set_status),
+            "set_pricing": ("game2", self.set_pricing),
+            "bid": ("game2", self.bid),
+        }
+
+    def with_connection(self, fn, *args):
+        """Run fn(conn, *args) on a pooled connection"""
+        conn = self.pool.getconn()
+        try:
+            return fn(conn, *args)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn)
+
+    async def run_db(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.with_connection, fn, *args)
+
+    async def read_state(self, game: str) -> dict:
+        if game == "game1":
+            return await self.run_db(self.game1_state)
+        return await self.run_db(self.game2_state)
+
+    @staticmethod
+    def game1_state(conn) -> dict:
+        game = Game1("Gateway", conn)
+        term_data = game.get_term_data()
+        approved = game.all_terms_approved()
+        # Terms can be approved before Team 1 has entered every value
+        has_valuation = approved and game.all_values_entered(term_data)
+        return {
+            "terms": {term: data.as_dict() for term, data in term_data.items()},
+            "approved": approved,
+            "valuation": game.calculate_valuation(term_data) if has_valuation else None
+        }
+
+    @staticmethod
+    def game2_state(conn) -> dict:
+        game = Game2("Gateway", conn)
+        if not game.has_team1_pricing_done():
+            return {"pricing_done": False, "results": None}
+        return {"pricing_done": True, "results": game.calculate_results()}
+
+    @staticmethod
+    def number_field(request: dict, field: str) -> float:
+        """A finite, non-negative number, as the CLI prompts accept"""
+        value = request[field]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{field} must be a number")
+        if not math.isfinite(value) or value < 0:
+            raise ValueError(f"{field} must be a finite, non-negative number")
+        return float(value)
+
+    @classmethod
+    def integer_field(cls, request: dict, field: str) -> int:
+        """A non-negative whole number"""
+        value = cls.number_field(request, field)
+        if not value.is_integer():
+            raise ValueError(f"{field} must be a whole number")
+        return int(value)
+
+    @classmethod
+    def edit_term(cls, conn, request: dict):
+        game = Game1("Team 1", conn)
+        term = request.get("term")
+        if term not in game.terms:
+            raise ValueError(f"Unknown term: {term}")
+        game.save_term(term, cls.number_field(request, "value"))
+
+    @staticmethod
+    def set_status(conn, request: dict):
+        game = Game1("Team 2", conn)
+        term = request.get("term")
+        if term not in game.terms:
+            raise ValueError(f"Unknown term: {term}")
+        if request.get("status") not in ("OK", "TBD"):
+            raise ValueError("Status must be OK or TBD")
+        game.set_term_status(term, request["status"])
+
+    @classmethod
+    def set_pricing(cls, conn, request: dict):
+        game = Game2("Team 1", conn)
+        company = cls.integer_field(request, "company")
+        if company not in game.companies:
+            raise ValueError(f"Unknown company: {company}")
+        game.save_pricing(
+            company,
+            cls.number_field(request, "price"),
+            cls.integer_field(request, "shares")
+        )
+        if game.has_team1_pricing_done():
+            game.redis.publish_update("team1_completed", "ready_for_team2")
+
+    @classmethod
+    def bid(cls, conn, request: dict):
+        game = Game2("Team 2", conn)
+        investor = cls.integer_field(request, "investor")
+        company = cls.integer_field(request, "company")
+        if investor not in game.investors or company not in game.companies:
+            raise ValueError(f"Unknown investor/company: {investor}/{company}")
+        game.save_bid(investor, company, cls.integer_field(request, "shares_bid"))
+        if game.has_team2_bids_done():
+            game.redis.publish_update("team2_completed", "done")
+
+    async def dispatch(self, request: dict) -> dict:
+        """Apply one {"op": ..., ...} action and return the game's new state"""
+        if not isinstance(request, dict):
+            raise ValueError("Request must be a JSON object")
+        op = request.get("op")
+        if op not in self.actions:
+            raise ValueError(f"Unknown op: {op}")
+        game, action = self.actions[op]
+        await self.run_db(action, request)
+        return {"type": "ok", "op": op, "game": game, "state": await self.read_state(game)}
+
+    async def handle_state(self, request):
+        game = request.match_info["game"]
+        if game not in GAME_CHANNELS:
+            raise web.HTTPNotFound(text=f"Unknown game: {game}")
+        try:
+            return web.json_response(await self.read_state(game))
+        except psycopg2.Error as e:
+            return self.db_error_response(e)
+
+    async def handle_action(self, request):
+        try:
+            body = await request.json()
+            return web.json_response(await self.dispatch(body))
+        except CLIENT_ERRORS as e:
+            return web.json_response({"type": "error", "error": str(e)}, status=400)
+        except psycopg2.Error as e:
+            return self.db_error_response(e)
+
+    @staticmethod
+    def db_error_response(e):
+        logging.error(f"Gateway database error: {e}")
+        return web.json_response({"type": "error", "error": "Database unavailable"}, status=503)
+
+    async def handle_ws(self, request):
+        game = request.match_info["game"]
+        if game not in GAME_CHANNELS:
+            raise web.HTTPNotFound(text=f"Unknown game: {game}")
+
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        session = self.sessions[game]
+        await session.add_client(ws)
+        try:
+            try:
+                await ws.send_json({"type": "state", "game": game, "state": await self.read_state(game)})
+            except psycopg2.Error as e:
+                logging.error(f"Gateway database error: {e}")
+                await ws.send_json({"type": "error", "error": "Database unavailable"})
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    await ws.send_json(await self.dispatch(json.loads(msg.data)))
+                except CLIENT_ERRORS as e:
+                    await ws.send_json({"type": "error", "error": str(e)})
+                except psycopg2.Error as e:
+                    logging.error(f"Gateway database error: {e}")
+                    await ws.send_json({"type": "error", "error": "Database unavailable"})
+        finally:
+            await session.remove_client(ws)
+        return ws
+
+    async def on_cleanup(self, app):
+        for session in self.sessions.values():
+            for ws in list(session.clients):
+                await ws.close()
+        await self.redis.close()
+        self.executor.shutdown(wait=True)
+        database.close_pool()
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.get("/state/{game}", self.handle_state),
+            web.post("/action", self.handle_action),
+            web.get("/ws/{game}", self.handle_ws),
+        ])
+        app.on_cleanup.append(self.on_cleanup)
+        return app
+
+
+if __name__ == "__main__":
+    database.init_db()
+    web.run_app(
+        Gateway().make_app(),
+        host=os.getenv("GATEWAY_HOST", "127.0.0.1"),
+        port=int(os.getenv("GATEWAY_PORT", 8080))
+    )
@@ -0,0 +1,159 @@
+import logging
+import time
+from typing import List, Optional, Tuple
+
+import redis
+from rich.console import Console, Group
+from rich.live import Live
+from rich.table import Table
+
+from redis_utils import redis_manager
+
+console = Console()
+
+
+class Leaderboard:
+    """Cross-session rankings kept in Redis sorted sets"""
+
+    MOST_BIDS = "leaderboard:most_bids"          # "<session>:<company>" -> shares bid
+    VALUATION = "leaderboard:valuation"          # session -> final valuation
+    FASTEST_DEAL = "leaderboard:fastest_deal"    # session -> seconds to close
+    DEAL_STARTED = "leaderboard:deal_started"    # hash: session -> first term entry time
+
+    # Sorted sets where a lower score ranks higher
+    ASCENDING = {FASTEST_DEAL}
+
+    def __init__(self, manager=redis_manager):
+        self.manager = manager
+
+    @property
+    def r(self):
+        return self.manager.r if self.manager.redis_connected else None
+
+    def record_bid(self, session: str, company: int, delta: int):
+        """Apply the change in a company's shares bid"""
+        if self.r is None or delta == 0:
+            return
+        try:
+            self.r.zincrby(self.MOST_BIDS, delta, f"{session}:{company}")
+        except redis.exceptions.RedisError as e:
+            logging.error(f"Redis leaderboard error: {e}")
+
+    def redis_time(self) -> float:
+        """Current time from the Redis server, shared by every team's process"""
+        seconds, microseconds = self.r.time()
+        return seconds + microseconds / 1_000_000
+
+    def record_deal_started(self, session: str):
+        """Remember when the session's current deal had its first term entered"""
+        if self.r is None:
+            return
+        try:
+            self.r.hsetnx(self.DEAL_STARTED, session, self.redis_time())
+        except redis.exceptions.RedisError as e:
+            logging.error(f"Redis leaderboard error: {e}")
+
+    def record_deal_closed(self, session: str, valuation: float):
+        """Rank the session's current deal once all its terms are approved
+
+        Both boards hold the session's latest closed deal. The start entry is
+        taken atomically, so the next negotiation in the same session is timed
+        from its own first term. Without a start entry (Redis was down at the
+        first term, or Team 1 used another SESSION_ID) only the valuation is
+        ranked.
+        """
+        if self.r is None:
+            return
+        try:
+            pipe = self.r.pipeline()
+            pipe.time()
+            pipe.hget(self.DEAL_STARTED, session)
+            pipe.hdel(self.DEAL_STARTED, session)
+            (seconds, microseconds), started, _ = pipe.execute()
+
+            pipe = self.r.pipeline()
+            pipe.zadd(self.VALUATION, {session: valuation})
+            if started is not None:
+                closed = seconds + microseconds / 1_000_000
+                pipe.zadd(self.FASTEST_DEAL, {session: closed - float(started)})
+            pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logging.error(f"Redis leaderboard error: {e}")
+
+    def top(self, key: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Return the k best (member, score) pairs"""
+        if self.r is None:
+            return []
+        try:
+            if key in self.ASCENDING:
+                return self.r.zrange(key, 0, k - 1, withscores=True)
+            return self.r.zrevrange(key, 0, k - 1, withscores=True)
+        except redis.exceptions.RedisError as e:
+            logging.error(f"Redis leaderboard error: {e}")
+            return []
+
+    def rank(self, key: str, member: str) -> Optional[int]:
+        """Return the 1-based rank of a member, or None if it is not ranked"""
+        if self.r is None:
+            return None
+        try:
+            if key in self.ASCENDING:
+                rank = self.r.zrank(key, member)
+            else:
+                rank = self.r.zrevrank(key, member)
+        except redis.exceptions.RedisError as e:
+            logging.error(f"Redis leaderboard error: {e}")
+            return None
+        return None if rank is None else rank + 1
+
+
+def build_tables(board: Leaderboard, k: int) -> Group:
+    most_bids = Table(title="Most-Bid Companies")
+    most_bids.add_column("#", justify="right")
+    most_bids.add_column("Session", style="cyan")
+    most_bids.add_column("Company")
+    most_bids.add_column("Shares Bid", justify="right", style="magenta")
+    for i, (member, score) in enumerate(board.top(Leaderboard.MOST_BIDS, k), 1):
+        session, _, company = member.rpartition(":")
+        most_bids.add_row(str(i), session, f"Company {company}", f"{score:,.0f}")
+
+    valuation = Table(title="Highest Valuations")
+    valuation.add_column("#", justify="right")
+    valuation.add_column("Session", style="cyan")
+    valuation.add_column("Valuation", justify="right", style="green")
+    for i, (session, score) in enumerate(board.top(Leaderboard.VALUATION, k), 1):
+        valuation.add_row(str(i), session, f"${score:,.2f}")
+
+    fastest = Table(title="Fastest Deals Closed")
+    fastest.add_column("#", justify="right")
+    fastest.add_column("Session", style="cyan")
+    fastest.add_column("Time", justify="right", style="yellow")
+    for i, (session, score) in enumerate(board.top(Leaderboard.FASTEST_DEAL, k), 1):
+        fastest.add_row(str(i), session, f"{score:,.1f}s")
+
+    return Group(most_bids, valuation, fastest)
+
+
+def show_leaderboards(k: int = 10, refresh: float = 2.0):
+    """Live view of the top-k rankings, refreshed from Redis only"""
+    board = Leaderboard()
+    if board.r is None:
+        console.print("[red]Redis is not connected - no leaderboards to show[/red]")
+        return
+
+    console.print("[i]Press Ctrl+C to exit[/i]")
+    try:
+        with Live(build_tables(board, k), console=console, auto_refresh=False) as live:
+            while True:
+                time.sleep(refresh)
+                live.update(build_tables(board, k), refresh=True)
+    except KeyboardInterrupt:
+        pass
+
+
+# Create single instance
+leaderboard = Leaderboard()
+
+
+if __name__ == "__main__":
+    show_leaderboards()
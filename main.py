@@ -5,21 +5,27 @@ import database
 import redis_utils
 from game1 import Game1
 from game2 import Game2
+from leaderboard import show_leaderboards
 
 console = Console()
 
 
 def main():
-    database.init_db()
-
     choice = questionary.select(
         "Select simulation game:",
-        choices=["Game 1: Terms Valuation", "Game 2: Share Bidding", "Exit"]
+        choices=["Game 1: Terms Valuation", "Game 2: Share Bidding", "Leaderboards", "Exit"]
     ).ask()
 
     if choice == "Exit":
         return
 
+    if choice == "Leaderboards":
+        show_leaderboards()
+        return
+
+    # Leaderboards only read Redis, so the database is set up after that choice
+    database.init_db()
+
     team = questionary.select(
         "Select your team:",
         choices=["Team 1", "Team 2"]
@@ -1,13 +1,25 @@
 import redis
 from dotenv import load_dotenv
+import atexit
 import os
 import logging
+import threading
+import time
 
 load_dotenv()
 
 class RedisManager:
     def __init__(self):
         self.redis_connected = False
+        # Publishes for the same channel/key within this window are merged into one
+        self.publish_window = float(os.getenv("REDIS_PUBLISH_WINDOW_MS", 20)) / 1000
+        self.publish_max_batch = int(os.getenv("REDIS_PUBLISH_MAX_BATCH", 500))
+        self.publish_stats = {"requested": 0, "published": 0, "coalesced": 0, "flushes": 0}
+        self._pending = {}  # (channel, key) -> latest message, oldest first
+        self._pending_since = None
+        self._last_publish = 0.0
+        self._publish_cond = threading.Condition()
+        self._flusher = None
         try:
             self.r = redis.Redis(
                 host=os.getenv("REDIS_HOST", "localhost"),
@@ -22,12 +34,102 @@ class RedisManager:
             logging.warning(f"Redis not connected: {e}")
             self.r = None
 
-    def publish_update(self, channel, message):
-        if self.redis_connected:
-            try:
-                self.r.publish(channel, message)
-            except redis.exceptions.RedisError as e:
-                logging.error(f"Redis publish error: {e}")
+    def publish_update(self, channel, message, key=None):
+        """Publish a message, coalescing bursts on the same channel and key
+
+        The first message after a quiet period goes out immediately. Messages
+        that follow within publish_window are queued, and a later message with
+        the same channel and key (the message itself by default) replaces the
+        queued one and moves to the back of the queue. Queued messages are sent
+        in the order they were last published, through one pipeline at most
+        publish_window after the first of them was queued.
+        """
+        if not self.redis_connected:
+            return
+        if self.publish_window <= 0:
+            with self._publish_cond:
+                self.publish_stats["requested"] += 1
+            self._send([(channel, message)])
+            return
+
+        with self._publish_cond:
+            self.publish_stats["requested"] += 1
+            now = time.monotonic()
+            if not self._pending and now - self._last_publish >= self.publish_window:
+                self._last_publish = now
+                send_now = True
+            else:
+                send_now = False
+                pending_key = (channel, message if key is None else key)
+                if pending_key in self._pending:
+                    # Move the key to the end so the newest message goes out last
+                    del self._pending[pending_key]
+                    self.publish_stats["coalesced"] += 1
+                elif not self._pending:
+                    self._pending_since = now
+                self._pending[pending_key] = message
+                self._start_flusher()
+                self._publish_cond.notify()
+
+        if send_now:
+            self._send([(channel, message)])
+
+    def flush(self):
+        """Send every queued message now"""
+        with self._publish_cond:
+            batch = self._take_pending()
+        if batch:
+            self._send(batch)
+
+    def get_publish_stats(self):
+        """Counters for publish requests and messages saved by coalescing"""
+        with self._publish_cond:
+            stats = dict(self.publish_stats)
+            stats["pending"] = len(self._pending)
+        return stats
+
+    def _start_flusher(self):
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="redis-publisher")
+            self._flusher.daemon = True
+            self._flusher.start()
+            atexit.register(self.flush)
+
+    def _take_pending(self):
+        batch = [(channel, message) for (channel, _), message in self._pending.items()]
+        self._pending = {}
+        self._pending_since = None
+        self._last_publish = time.monotonic()
+        return batch
+
+    def _flush_loop(self):
+        while True:
+            with self._publish_cond:
+                while not self._pending:
+                    self._publish_cond.wait()
+                while self._pending and len(self._pending) < self.publish_max_batch:
+                    remaining = self._pending_since + self.publish_window - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._publish_cond.wait(remaining)
+                batch = self._take_pending()
+            if batch:
+                self._send(batch)
+
+    def _send(self, batch):
+        try:
+            if len(batch) == 1:
+                self.r.publish(*batch[0])
+            else:
+                pipe = self.r.pipeline(transaction=False)
+                for channel, message in batch:
+                    pipe.publish(channel, message)
+                pipe.execute()
+            with self._publish_cond:
+                self.publish_stats["published"] += len(batch)
+                self.publish_stats["flushes"] += 1
+        except redis.exceptions.RedisError as e:
+            logging.error(f"Redis publish error: {e}")
 
     def subscribe_to_channel(self, channel):
         if self.redis_connected:
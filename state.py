@@ -0,0 +1,95 @@
+import sys
+from array import array
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Iterable, Optional
+
+
+class TermStatus(str, Enum):
+    """Team 2's verdict on a Game 1 term"""
+    OK = "OK"
+    TBD = "TBD"
+
+
+class Subscription(str, Enum):
+    """How a Game 2 company's shares were taken up"""
+    FILLED = "Filled"
+    UNDER = "Under"
+    OVER = "Over"
+
+
+# Shown instead of capital raised when a company is oversubscribed
+ALLOCATE = "Allocate"
+
+
+@dataclass
+class TermState:
+    """One Game 1 term as stored in game1_terms"""
+    __slots__ = ("value", "unit", "status")
+
+    value: Optional[float]
+    unit: str
+    status: TermStatus
+
+    @classmethod
+    def from_row(cls, value, unit, status) -> "TermState":
+        # Units repeat across every session, so share one string per unit
+        return cls(value, sys.intern(unit), TermStatus(status))
+
+    def as_dict(self) -> Dict:
+        return {'value': self.value, 'unit': self.unit, 'status': self.status.value}
+
+
+class CompanyBook:
+    """Game 2 pricing and bid totals held as typed columns, one slot per company"""
+    __slots__ = ("companies", "prices", "shares", "bids")
+
+    def __init__(self, companies: Iterable[int]):
+        self.companies = tuple(companies)
+        n = len(self.companies)
+        self.prices = array('d', bytes(8 * n))
+        self.shares = array('q', bytes(8 * n))
+        self.bids = array('q', bytes(8 * n))
+
+    def index(self, company: int) -> int:
+        return self.companies.index(company)
+
+    def set_company(self, company: int, price: float, shares: int, bids: int):
+        i = self.index(company)
+        self.prices[i] = price
+        self.shares[i] = shares
+        self.bids[i] = bids
+
+    def capital_raised(self, company: int) -> Optional[float]:
+        """Capital raised, or None when the shares have to be allocated"""
+        i = self.index(company)
+        if self.bids[i] <= self.shares[i]:
+            return self.bids[i] * self.prices[i]
+        return None
+
+    def subscription(self, company: int) -> Subscription:
+        i = self.index(company)
+        if self.bids[i] == self.shares[i]:
+            return Subscription.FILLED
+        elif self.bids[i] < self.shares[i]:
+            return Subscription.UNDER
+        return Subscription.OVER
+
+    def most_bids(self) -> int:
+        """Company with the most shares bid (the first one on a tie)"""
+        best = max(range(len(self.companies)), key=lambda i: (self.bids[i], -i))
+        return self.companies[best]
+
+    def as_dict(self) -> Dict[str, Dict[int, object]]:
+        """Results in the nested-dict shape shown to both teams"""
+        capital_raised = {}
+        for company in self.companies:
+            capital = self.capital_raised(company)
+            capital_raised[company] = ALLOCATE if capital is None else capital
+        return {
+            "shares_bid": {c: self.bids[i] for i, c in enumerate(self.companies)},
+            "capital_raised": capital_raised,
+            "subscription": {c: self.subscription(c).value for c in self.companies},
+            "most_bids": self.most_bids()
+        }
+
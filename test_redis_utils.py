@@ -0,0 +1,160 @@
+import threading
+import time
+
+import pytest
+
+import redis_utils
+from redis_utils import RedisManager
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.queued = []
+
+    def publish(self, channel, message):
+        self.queued.append((channel, message))
+
+    def execute(self):
+        self.client.record(self.queued, pipelined=True)
+
+
+class FakeRedis:
+    """Records what would have been published, with no Redis server"""
+
+    def __init__(self, **kwargs):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def ping(self):
+        return True
+
+    def publish(self, channel, message):
+        self.record([(channel, message)], pipelined=False)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def record(self, messages, pipelined):
+        with self.lock:
+            self.batches.append((time.monotonic(), list(messages), pipelined))
+
+    def messages(self):
+        with self.lock:
+            return [m for _, batch, _ in self.batches for m in batch]
+
+    def wait_for_batches(self, count, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                if len(self.batches) >= count:
+                    return True
+            time.sleep(0.005)
+        return False
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(redis_utils.redis, "Redis", FakeRedis)
+    monkeypatch.setenv("REDIS_PUBLISH_WINDOW_MS", "50")
+    monkeypatch.setenv("REDIS_PUBLISH_MAX_BATCH", "500")
+    return RedisManager()
+
+
+def test_first_message_is_sent_immediately(manager):
+    manager.publish_update("team1_updates", "EBITDA")
+
+    assert manager.r.messages() == [("team1_updates", "EBITDA")]
+    assert manager.get_publish_stats()["pending"] == 0
+
+
+def test_repeated_message_is_coalesced_and_sent_last(manager):
+    for term in ["warmup", "EBITDA", "Multiple", "EBITDA"]:
+        manager.publish_update("team1_updates", term)
+
+    assert manager.r.wait_for_batches(2)
+    assert manager.r.batches[1][1] == [
+        ("team1_updates", "Multiple"),
+        ("team1_updates", "EBITDA"),
+    ]
+    stats = manager.get_publish_stats()
+    assert stats["requested"] == 4
+    assert stats["published"] == 3
+    assert stats["coalesced"] == 1
+
+
+def test_burst_sends_each_term_once(manager):
+    for term in ["EBITDA", "Multiple"] * 100:
+        manager.publish_update("team1_updates", term)
+
+    assert manager.r.wait_for_batches(2)
+    assert manager.r.messages() == [
+        ("team1_updates", "EBITDA"),
+        ("team1_updates", "EBITDA"),
+        ("team1_updates", "Multiple"),
+    ]
+    assert manager.get_publish_stats()["coalesced"] == 197
+
+
+def test_same_key_keeps_latest_message(manager):
+    manager.publish_update("prices", "warmup")
+    manager.publish_update("prices", "company 1 at 10", key=1)
+    manager.publish_update("prices", "company 2 at 5", key=2)
+    manager.publish_update("prices", "company 1 at 12", key=1)
+
+    assert manager.r.wait_for_batches(2)
+    _, batch, pipelined = manager.r.batches[1]
+    assert batch == [("prices", "company 2 at 5"), ("prices", "company 1 at 12")]
+    assert pipelined
+    assert manager.get_publish_stats()["coalesced"] == 1
+
+
+def test_queued_messages_are_delayed_at_most_one_window(manager):
+    manager.publish_update("team1_updates", "warmup")
+    queued_at = time.monotonic()
+    manager.publish_update("team1_updates", "EBITDA")
+
+    assert manager.r.wait_for_batches(2)
+    sent_at = manager.r.batches[1][0]
+    # Allow for thread scheduling on a loaded machine
+    assert sent_at - queued_at <= manager.publish_window + 0.05
+
+
+def test_full_batch_is_flushed_before_the_window_ends(manager):
+    manager.publish_window = 10.0
+    manager.publish_max_batch = 3
+
+    manager.publish_update("bids", "warmup")
+    start = time.monotonic()
+    for company in [1, 2, 3]:
+        manager.publish_update("bids", f"company {company}")
+
+    assert manager.r.wait_for_batches(2)
+    assert manager.r.batches[1][0] - start < 1.0
+    assert manager.r.batches[1][1] == [
+        ("bids", "company 1"),
+        ("bids", "company 2"),
+        ("bids", "company 3"),
+    ]
+
+
+def test_flush_sends_pending_messages_now(manager):
+    manager.publish_window = 10.0
+
+    manager.publish_update("team2_updates", "warmup")
+    manager.publish_update("team2_updates", "EBITDA")
+    assert manager.get_publish_stats()["pending"] == 1
+
+    manager.flush()
+    assert manager.r.messages()[-1] == ("team2_updates", "EBITDA")
+    assert manager.get_publish_stats()["pending"] == 0
+
+
+def test_zero_window_publishes_every_message(manager):
+    manager.publish_window = 0
+
+    for _ in range(3):
+        manager.publish_update("team1_updates", "EBITDA")
+
+    assert manager.r.messages() == [("team1_updates", "EBITDA")] * 3
+    assert manager.get_publish_stats()["coalesced"] == 0